@@ -4,21 +4,42 @@ BingHome Hub - Enhanced with Weather Integration and App Management
 """
 
 import os
+
+# Socket.IO async mode - gevent must patch the stdlib before anything else imports it
+ASYNC_MODE = os.environ.get('ASYNC_MODE', 'gevent')
+if ASYNC_MODE == 'gevent':
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        ASYNC_MODE = 'threading'
+
+import re
 import sys
 import json
 import time
+import queue
+import random
+import shutil
+import secrets
 import threading
+import socket
+import stat
+import struct
+import fcntl
+import array
 import subprocess
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import urlencode
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Flask imports
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, g, render_template, request, jsonify, redirect, url_for, session
 
 # Import core modules with fallback
 sys.path.insert(0, str(Path(__file__).parent))
@@ -28,20 +49,28 @@ try:
     from core.timers import TimerManager
     from core.weather import WeatherService
     from core.device_discovery import DeviceDiscovery
-    from core.google_photos import GooglePhotosService
+    from core.google_photos import GooglePhotosService, token_expiry, fetch_shared_album_photos
     from core.cameras import camera_service, security_camera_service
+    from core.http_session import http_session
+    from core.blocking import run_blocking
     import bluetooth_utils
     logger.info("Core modules imported successfully")
 except ImportError as e:
-    logger.error(f"Failed to import core modules: {e}")
+    logger.error("Failed to import core modules: %s", e)
     MediaController = None
     NewsManager = None
     TimerManager = None
     WeatherService = None
     DeviceDiscovery = None
     GooglePhotosService = None
+    token_expiry = None
+    fetch_shared_album_photos = None
     camera_service = None
     security_camera_service = None
+    import requests as http_session  # same get/post API, just without the shared pool
+
+    def run_blocking(func, *args):
+        return func(*args)
 
 # Hardware imports with fallback
 try:
@@ -55,16 +84,69 @@ except ImportError:
 
 # Socket.IO import with fallback
 try:
-    from flask_socketio import SocketIO, emit
+    from flask_socketio import SocketIO, emit, join_room
     SOCKETIO_AVAILABLE = True
 except ImportError:
     SOCKETIO_AVAILABLE = False
     logger.warning("SocketIO not available")
 
+# Fast JSON provider import with fallback
+try:
+    import orjson
+    from flask_orjson import OrjsonProvider
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.info("orjson not available - using standard JSON encoder")
+
+# Netlink import with fallback (reads interface addresses without spawning `ip`)
+try:
+    from pyroute2 import IPRoute
+    PYROUTE2_AVAILABLE = True
+except ImportError:
+    PYROUTE2_AVAILABLE = False
+
+# System stats import with fallback
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Response cache import with fallback
+try:
+    from flask_caching import Cache
+    CACHING_AVAILABLE = True
+except ImportError:
+    CACHING_AVAILABLE = False
+    logger.info("Flask-Caching not available - API responses will not be cached")
+
 # Configuration
 BASE_DIR = Path(__file__).parent
 CONFIG_FILE = BASE_DIR / "settings.json"
 TEMPLATES_DIR = BASE_DIR / "templates"
+SENSOR_POLL_INTERVAL = 15  # seconds between hardware sensor polls
+SENSOR_HEARTBEAT_POLLS = 6  # re-send an unchanged reading after this many polls
+SENSOR_MIN_READ_INTERVAL = 2  # seconds; the DHT22 returns garbage if read faster
+NETWORK_STATUS_TTL = 5  # seconds a network status lookup is reused
+CPU_TEMP_TTL = 5  # seconds a CPU temperature reading is reused
+CPU_TEMP_FILE = Path('/sys/class/thermal/thermal_zone0/temp')
+# Settings whose values never leave the hub; the API only reports whether they are set
+SENSITIVE_SETTINGS = frozenset({
+    'openai_api_key', 'weather_api_key', 'bing_api_key', 'home_assistant_token',
+    'google_photos_access_token', 'google_photos_refresh_token',
+})
+# Settings each long-lived service reads, so a save only refreshes the services it affects
+WEATHER_SETTINGS = frozenset({'weather_api_key', 'weather_location', 'weather_source'})
+DEVICE_SETTINGS = frozenset({'home_assistant_url', 'home_assistant_token'})
+IP_HOST_RE = re.compile(r'^https?://\d+\.\d+\.\d+\.\d+')  # Google OAuth rejects bare IPs
+
+# Wireless extensions, as used by `iwconfig`
+SIOCGIWESSID = 0x8B1B
+IW_ESSID_MAX_SIZE = 32
+IWREQ_FORMAT = '16sPHH'  # ifr_name, then iw_point {pointer, length, flags}
+IWREQ_SIZE = 32
+PROC_NET_WIRELESS = Path('/proc/net/wireless')
 
 # Create required directories
 for dir_path in [TEMPLATES_DIR, BASE_DIR / "static", BASE_DIR / "core"]:
@@ -74,20 +156,84 @@ for dir_path in [TEMPLATES_DIR, BASE_DIR / "static", BASE_DIR / "core"]:
 app = Flask(__name__, template_folder=str(TEMPLATES_DIR))
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'binghome-hub-secret-key')
 
+if ORJSON_AVAILABLE:
+    # Serialize jsonify() responses and parse request bodies with orjson
+    app.json = OrjsonProvider(app)
+    app.json.option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+else:
+    # Flask 2.3 dropped JSON_SORT_KEYS/JSONIFY_PRETTYPRINT_REGULAR; set them on the provider
+    app.json.sort_keys = False
+    app.json.compact = True
+
+if CACHING_AVAILABLE:
+    # SimpleCache is per-process; set CACHE_TYPE=RedisCache to share it across workers
+    cache = Cache(app, config={
+        'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'SimpleCache'),
+        'CACHE_REDIS_HOST': os.environ.get('CACHE_REDIS_HOST', 'localhost'),
+        'CACHE_DEFAULT_TIMEOUT': 2
+    })
+else:
+    cache = None
+
+class OrjsonSocketIOJSON:
+    """json-module stand-in so Socket.IO packets are encoded with orjson (always compact, so extra kwargs are ignored)"""
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj, option=app.json.option).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
 if SOCKETIO_AVAILABLE:
-    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+    socketio_options = {'json': OrjsonSocketIOJSON} if ORJSON_AVAILABLE else {}
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE, **socketio_options)
+    logger.info("SocketIO async mode: %s", ASYNC_MODE)
 else:
     socketio = None
 
+# Session IDs of connected Socket.IO clients
+connected_clients = set()
+SENSOR_ROOM = 'sensors'
+
+# Last formatted timestamp, keyed by whole second
+_iso_cache = (None, '')
+
+def iso_now():
+    """Local ISO timestamp at one-second resolution, formatted at most once per second"""
+    global _iso_cache
+    sec = int(time.time())
+    if sec != _iso_cache[0]:
+        _iso_cache = (sec, datetime.fromtimestamp(sec).isoformat())
+    return _iso_cache[1]
+
 # ============================================
 # BingHome Hub Class
 # ============================================
 
 class BingHomeHub:
     def __init__(self):
+        self._settings_on_disk = False  # set once self.settings matches settings.json
         self.settings = self.load_settings()
+        self._safe_settings = None
+        self._safe_settings_json = None
+        self._safe_settings_source = None
         self.running = True
         
+        # Last sensor snapshot, refreshed by the background poller.
+        # Snapshots are never mutated once published, so readers need no lock.
+        self._last_sensor_data = None
+        self._sensor_polled_at = 0.0
+        self._sensor_lock = threading.Lock()
+        self._network_status = None
+        self._network_status_expires = 0.0
+        self._cpu_temp = None
+        self._cpu_temp_expires = 0.0
+        
+        # Announcements are spoken one at a time by a dedicated worker
+        self._tts_queue = queue.Queue()
+        threading.Thread(target=self._tts_worker, daemon=True).start()
+        
         # Initialize controllers with settings
         self.initialize_controllers()
         
@@ -115,7 +261,7 @@ class BingHomeHub:
                 self.google_photos = None
             logger.info("Controllers initialized successfully")
         except Exception as e:
-            logger.error(f"Error initializing controllers: {e}")
+            logger.error("Error initializing controllers: %s", e)
             self.media = self.create_fallback_media()
             self.news = self.create_fallback_news()
             self.timers = self.create_fallback_timers()
@@ -180,6 +326,7 @@ class BingHomeHub:
             "google_photos_connected": False,
             "google_photos_access_token": "",
             "google_photos_refresh_token": "",
+            "google_photos_token_expires_at": "",
             "google_photos_album": "",
             "google_photos_interval": 10,
             "voice_provider": "local",
@@ -215,33 +362,92 @@ class BingHomeHub:
         
         try:
             if CONFIG_FILE.exists():
-                with open(CONFIG_FILE, 'r') as f:
-                    settings = json.load(f)
+                settings = app.json.loads(CONFIG_FILE.read_bytes())
+                if not isinstance(settings, dict):
+                    raise ValueError("settings.json does not hold a JSON object")
                 # Merge with defaults
                 for key, value in default_settings.items():
                     if key not in settings:
                         settings[key] = value
+                self._settings_on_disk = True
                 return settings
-        except Exception as e:
-            logger.error(f"Error loading settings: {e}")
+        except (OSError, ValueError) as e:
+            # Unreadable file or malformed JSON - fall back to defaults
+            logger.error("Error loading settings: %s", e)
         
         return default_settings
     
+    def get_safe_settings(self):
+        """Settings with secrets blanked out, rebuilt only when the settings dict is replaced"""
+        # save_settings and a reload from disk both swap in a new dict, which invalidates this
+        if self._safe_settings_source is not self.settings:
+            safe_settings = self.settings.copy()
+            for key in SENSITIVE_SETTINGS.intersection(safe_settings):
+                if safe_settings[key]:
+                    safe_settings[key + '_configured'] = True
+                    safe_settings[key] = ''
+            self._safe_settings = safe_settings
+            self._safe_settings_json = None
+            self._safe_settings_source = self.settings
+        return self._safe_settings
+    
+    def get_safe_settings_json(self):
+        """Redacted settings as a JSON body, encoded once per settings dict"""
+        safe_settings = self.get_safe_settings()
+        if self._safe_settings_json is None:
+            self._safe_settings_json = app.json.dumps(safe_settings)
+        return self._safe_settings_json
+    
+    def _write_settings_file(self, data):
+        """Write a synced sibling file and swap it in, so a power cut mid-write can't truncate settings.json"""
+        # It holds API keys, so keep the existing file's mode (owner-only for a new one)
+        try:
+            mode = stat.S_IMODE(CONFIG_FILE.stat().st_mode)
+        except FileNotFoundError:
+            mode = 0o600
+        tmp_file = CONFIG_FILE.with_name(CONFIG_FILE.name + '.tmp')
+        try:
+            with open(os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode), 'wb') as f:
+                os.fchmod(f.fileno(), mode)  # a leftover tmp file keeps its old mode otherwise
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, CONFIG_FILE)
+        except Exception:
+            tmp_file.unlink(missing_ok=True)
+            raise
+    
     def save_settings(self, settings):
         """Save settings to JSON file"""
+        # Nothing changed since the last load/save - skip rewriting the SD card
+        if settings == self.settings and self._settings_on_disk:
+            logger.debug("Settings unchanged, skipping write")
+            return True
+        
         try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(settings, f, indent=2)
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(settings, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(settings, indent=2).encode()
+            # fsync on an SD card can take a while and gevent can't yield inside it
+            run_blocking(self._write_settings_file, data)
+            old_settings = self.settings
             self.settings = settings
+            self._settings_on_disk = True
             
-            # Update weather service with new settings
-            if hasattr(self.weather, 'update_settings'):
+            # Only hand new settings to the services whose keys actually changed
+            changed = {key for key in settings.keys() | old_settings.keys()
+                       if settings.get(key) != old_settings.get(key)}
+            if changed & WEATHER_SETTINGS and hasattr(self.weather, 'update_settings'):
                 self.weather.update_settings(settings)
+            if changed & DEVICE_SETTINGS and hasattr(self.devices, 'update_settings'):
+                self.devices.update_settings(settings)
             
             logger.info("Settings saved successfully")
             return True
-        except Exception as e:
-            logger.error(f"Error saving settings: {e}")
+        except (OSError, TypeError) as e:
+            # Disk write failure or a value JSON can't encode
+            logger.error("Error saving settings: %s", e)
             return False
     
     def setup_hardware(self):
@@ -269,15 +475,80 @@ class BingHomeHub:
             logger.info("Hardware sensors initialized")
             
         except Exception as e:
-            logger.error(f"Hardware setup error: {e}")
+            logger.error("Hardware setup error: %s", e)
             self.sensors = {}
     
-    def read_sensors(self):
-        """Read all sensor data"""
-        import random
+    def read_sensors(self, force=False):
+        """Get the latest sensor data, only touching the hardware when forced or nothing is cached"""
+        data = self._last_sensor_data
+        if data is None or force:
+            # Nothing polled yet (background tasks not started) or caller wants a fresh reading
+            data = self.poll_sensors()
+        return data
+    
+    def poll_sensors(self):
+        """Read all sensor data from the hardware and cache it"""
+        # One reader at a time - overlapping DHT22 reads corrupt each other
+        with self._sensor_lock:
+            # Whoever held the lock before us may have just taken a reading
+            if (self._last_sensor_data is not None
+                    and time.monotonic() - self._sensor_polled_at < SENSOR_MIN_READ_INTERVAL):
+                return self._last_sensor_data
+            if RPI_AVAILABLE:
+                # DHT22 reads bit-bang GPIO inside C code
+                data = run_blocking(self._read_sensor_hardware)
+            else:
+                data = self._read_sensor_hardware()
+            self._last_sensor_data = data
+            self._sensor_polled_at = time.monotonic()
+            return data
+    
+    def announce(self, message):
+        """Queue a text-to-speech announcement and return immediately"""
+        self._tts_queue.put(message)
+    
+    def _tts_worker(self):
+        """Speak queued announcements in order, falling back to espeak"""
+        while True:
+            message = self._tts_queue.get()
+            # One bad announcement must not kill the only worker
+            try:
+                if run_blocking(self._speak, message):
+                    continue
+                subprocess.run(['espeak', message], capture_output=True)
+            except Exception as e:
+                logger.error("espeak error: %s", e)
+    
+    def _speak(self, message):
+        """Speak a message with pyttsx3, returning whether it succeeded"""
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty('rate', self.settings.get('tts_rate', 150))
+            engine.setProperty('volume', self.settings.get('tts_volume', 0.9))
+            engine.say(message)
+            engine.runAndWait()
+            return True
+        except Exception as e:
+            logger.error("TTS error: %s", e)
+            return False
+    
+    def _read_sensor_hardware(self):
+        """Read all sensor data into a new dict"""
+        if not RPI_AVAILABLE:
+            # Simulate sensor data
+            rand = random.random
+            return {
+                'timestamp': iso_now(),
+                'temperature': round(15 + rand() * 20, 1),
+                'humidity': round(30 + rand() * 40, 1),
+                'gas_detected': rand() >= 0.75,
+                'light_level': ('dark', 'dim', 'bright')[int(rand() * 3)],
+                'air_quality': ('excellent', 'good', 'moderate')[int(rand() * 3)]
+            }
 
         data = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': iso_now(),
             'temperature': None,
             'humidity': None,
             'gas_detected': False,
@@ -285,17 +556,6 @@ class BingHomeHub:
             'air_quality': 'good'
         }
 
-        if not RPI_AVAILABLE:
-            # Simulate sensor data
-            data.update({
-                'temperature': round(20 + random.uniform(-5, 15), 1),
-                'humidity': round(40 + random.uniform(-10, 30), 1),
-                'gas_detected': random.choice([False, False, False, True]),
-                'light_level': random.choice(['dark', 'dim', 'bright']),
-                'air_quality': random.choice(['excellent', 'good', 'moderate'])
-            })
-            return data
-
         try:
             if hasattr(self, 'sensors'):
                 # Read DHT22 with retry logic
@@ -316,18 +576,19 @@ class BingHomeHub:
                                 temp_offset = self.settings.get('temp_offset', 0)
                                 data['temperature'] = round(temperature + temp_offset, 1)
                                 data['humidity'] = round(humidity, 1)
-                                logger.debug(f"DHT22 read successful: {temperature}°C (raw) -> {data['temperature']}°C (calibrated), {humidity}%")
+                                logger.debug("DHT22 read successful: %s°C (raw) -> %s°C (calibrated), %s%%",
+                                             temperature, data['temperature'], humidity)
                                 break
                             else:
-                                logger.warning(f"DHT22 returned None values (attempt {attempt + 1}/{max_retries})")
+                                logger.warning("DHT22 returned None values (attempt %d/%d)", attempt + 1, max_retries)
 
                         except RuntimeError as e:
                             # DHT sensors often throw RuntimeError for checksum/timing issues
-                            logger.warning(f"DHT22 read failed (attempt {attempt + 1}/{max_retries}): {e}")
+                            logger.warning("DHT22 read failed (attempt %d/%d): %s", attempt + 1, max_retries, e)
                             if attempt < max_retries - 1:
                                 time.sleep(retry_delay)
                         except Exception as e:
-                            logger.error(f"DHT22 unexpected error (attempt {attempt + 1}/{max_retries}): {e}")
+                            logger.error("DHT22 unexpected error (attempt %d/%d): %s", attempt + 1, max_retries, e)
                             if attempt < max_retries - 1:
                                 time.sleep(retry_delay)
 
@@ -342,7 +603,7 @@ class BingHomeHub:
                         data['gas_detected'] = bool(gas_state)
                         data['air_quality'] = 'poor' if gas_state else 'good'
                     except Exception as e:
-                        logger.error(f"Gas sensor read error: {e}")
+                        logger.error("Gas sensor read error: %s", e)
 
                 # Read light sensor
                 if 'light_pin' in self.sensors:
@@ -350,15 +611,93 @@ class BingHomeHub:
                         light_state = GPIO.input(self.sensors['light_pin'])
                         data['light_level'] = 'bright' if light_state else 'dark'
                     except Exception as e:
-                        logger.error(f"Light sensor read error: {e}")
+                        logger.error("Light sensor read error: %s", e)
 
         except Exception as e:
-            logger.error(f"Sensor read error: {e}")
+            logger.error("Sensor read error: %s", e)
 
         return data
     
+    def _wifi_link(self, ifname):
+        """SSID and signal level (dBm) of a wireless interface, queried in-process"""
+        ssid, signal = '', 0
+        try:
+            buf = array.array('B', bytes(IW_ESSID_MAX_SIZE + 1))
+            addr, length = buf.buffer_info()
+            iwreq = struct.pack(IWREQ_FORMAT, ifname.encode(), addr, length, 0).ljust(IWREQ_SIZE, b'\0')
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                reply = fcntl.ioctl(sock, SIOCGIWESSID, iwreq)
+            length = struct.unpack_from(IWREQ_FORMAT, reply)[2]
+            ssid = buf[:length].tobytes().decode('utf-8', 'replace')
+        except OSError:
+            pass
+        
+        # "wlan0: 0000   70.  -40.  -256 ..." - status, link quality, signal level, noise
+        try:
+            for line in PROC_NET_WIRELESS.read_text().splitlines():
+                name, _, fields = line.partition(':')
+                if name.strip() == ifname:
+                    signal = int(float(fields.split()[2]))
+                    break
+        except (OSError, ValueError, IndexError):
+            pass
+        return ssid, signal
+    
+    def _interface_addresses(self):
+        """First IPv4 address of each interface, by name"""
+        addresses = {}
+        if PYROUTE2_AVAILABLE:
+            try:
+                with IPRoute() as ipr:
+                    for msg in ipr.get_addr(family=socket.AF_INET):
+                        addresses.setdefault(msg.get_attr('IFA_LABEL'), msg.get_attr('IFA_ADDRESS'))
+                return addresses
+            except Exception as e:
+                # No netlink access or an incompatible pyroute2 - fall back to `ip`
+                logger.warning("pyroute2 address query failed: %s", e)
+                addresses = {}
+        
+        # One terse line per IPv4 address: "<idx>: <ifname>    inet <addr>/<prefix> ..."
+        result = subprocess.run(['ip', '-4', '-o', 'addr', 'show'],
+                              capture_output=True, text=True, timeout=5)
+        for line in result.stdout.splitlines():
+            fields = line.split()
+            if len(fields) > 3:
+                addresses.setdefault(fields[1], fields[3].split('/')[0])
+        return addresses
+    
     def get_network_status(self):
-        """Get network connection status"""
+        """Get network connection status, reusing a lookup from the last few seconds"""
+        now = time.monotonic()
+        if self._network_status is None or now >= self._network_status_expires:
+            self._network_status = self._read_network_status()
+            self._network_status_expires = now + NETWORK_STATUS_TTL
+        return self._network_status
+    
+    def get_cpu_temp(self):
+        """Get the SoC temperature in degrees C, reusing a reading from the last few seconds"""
+        now = time.monotonic()
+        if now >= self._cpu_temp_expires:
+            try:
+                self._cpu_temp = round(int(CPU_TEMP_FILE.read_text()) / 1000, 1)
+            except (OSError, ValueError):
+                self._cpu_temp = None
+            self._cpu_temp_expires = now + CPU_TEMP_TTL
+        return self._cpu_temp
+    
+    def get_system_info(self):
+        """Get CPU temperature, memory, disk and uptime for the status page"""
+        info = {'cpu_temp': self.get_cpu_temp()}
+        # Time since boot on the kernel's clock - the wall clock jumps when NTP syncs after boot
+        if hasattr(time, 'CLOCK_BOOTTIME'):
+            info['uptime'] = str(timedelta(seconds=int(time.clock_gettime(time.CLOCK_BOOTTIME))))
+        if PSUTIL_AVAILABLE:
+            info['memory_used_percent'] = round(psutil.virtual_memory().percent)
+            info['disk_used_percent'] = round(psutil.disk_usage(str(BASE_DIR)).percent)
+        return info
+    
+    def _read_network_status(self):
+        """Query interface state"""
         status = {
             'wifi': {'connected': False, 'ssid': '', 'signal': 0},
             'ethernet': {'connected': False, 'ip': ''},
@@ -366,34 +705,51 @@ class BingHomeHub:
         }
         
         try:
-            result = subprocess.run(['ip', 'addr', 'show', 'eth0'], 
-                                  capture_output=True, text=True)
-            if 'inet ' in result.stdout:
+            addresses = self._interface_addresses()
+            
+            if 'eth0' in addresses:
                 status['ethernet']['connected'] = True
-                for line in result.stdout.split('\n'):
-                    if 'inet ' in line:
-                        status['ethernet']['ip'] = line.split()[1].split('/')[0]
-                        break
+                status['ethernet']['ip'] = addresses['eth0']
                 status['primary'] = 'ethernet'
-            else:
-                # Check WiFi as fallback
-                try:
-                    result = subprocess.run(['iwconfig', 'wlan0'], 
-                                          capture_output=True, text=True)
-                    if 'ESSID:' in result.stdout and 'off/any' not in result.stdout:
-                        status['wifi']['connected'] = True
-                        status['primary'] = 'wifi'
-                except:
-                    pass
+            elif 'wlan0' in addresses:
+                status['wifi']['connected'] = True
+                status['primary'] = 'wifi'
+                status['wifi']['ssid'], status['wifi']['signal'] = self._wifi_link('wlan0')
                     
         except Exception as e:
-            logger.error(f"Network status error: {e}")
+            logger.error("Network status error: %s", e)
         
         return status
 
 # Initialize the system
 binghome = BingHomeHub()
 
+# Fallback pages used when templates are missing
+FALLBACK_INDEX_HTML = '''<!DOCTYPE html>
+<html><head><title>BingHome Hub</title>
+<style>body{background:#000;color:#fff;font-family:Arial;text-align:center;padding:50px;}
+h1{color:#00ff88;}</style></head>
+<body><h1>BingHome Hub</h1><p>System Running</p><a href="/settings">Settings</a></body></html>
+'''
+NOT_FOUND_HTML = "<h1>404 - Page Not Found</h1><a href='/'>Home</a>"
+SERVER_ERROR_HTML = "<h1>500 - Server Error</h1><a href='/'>Home</a>"
+
+# Templates each page can use, in order of preference; older installs may only ship the later ones
+PAGE_TEMPLATES = {
+    'index': ('dashboard.html', 'hub_v3.html', 'hub_enhanced.html', 'hub.html', 'index.html'),
+    'not_found': ('404.html',),
+    'server_error': ('500.html',),
+}
+
+def resolve_page_templates(pages):
+    """Map each page to the first of its candidate templates the loader can find, or None"""
+    available = set(app.jinja_env.list_templates())
+    return {page: next((name for name in candidates if name in available), None)
+            for page, candidates in pages.items()}
+
+# Resolved once - the templates directory doesn't change while the hub is running
+PAGE_TEMPLATE = resolve_page_templates(PAGE_TEMPLATES)
+
 # ============================================
 # Flask Routes
 # ============================================
@@ -401,29 +757,15 @@ binghome = BingHomeHub()
 @app.route('/')
 def index():
     """Main hub interface - customizable dashboard"""
+    template = PAGE_TEMPLATE['index']
+    if template is None:
+        # Fallback HTML if no templates exist
+        return FALLBACK_INDEX_HTML
     try:
-        return render_template('dashboard.html', settings=binghome.settings)
-    except:
-        try:
-            return render_template('hub_v3.html', settings=binghome.settings)
-        except:
-            try:
-                return render_template('hub_enhanced.html', settings=binghome.settings)
-            except:
-                try:
-                    return render_template('hub.html', settings=binghome.settings)
-                except:
-                    try:
-                        return render_template('index.html', settings=binghome.settings)
-                    except:
-                        # Fallback HTML if no templates exist
-                        return f'''
-                        <!DOCTYPE html>
-                        <html><head><title>BingHome Hub</title>
-                        <style>body{{background:#000;color:#fff;font-family:Arial;text-align:center;padding:50px;}}
-                        h1{{color:#00ff88;}}</style></head>
-                        <body><h1>BingHome Hub</h1><p>System Running</p><a href="/settings">Settings</a></body></html>
-                        '''
+        return render_template(template, settings=binghome.settings)
+    except Exception as e:
+        logger.error("Index template error: %s", e)
+        return FALLBACK_INDEX_HTML
 
 @app.route('/settings')
 def settings_page():
@@ -431,7 +773,7 @@ def settings_page():
     try:
         return render_template('settings.html', settings=binghome.settings)
     except Exception as e:
-        logger.error(f"Settings template error: {e}")
+        logger.error("Settings template error: %s", e)
         return f"<h1>Settings</h1><p>Template error: {e}</p><a href='/'>Back</a>"
 
 @app.route('/bluetooth')
@@ -444,17 +786,12 @@ def system_page():
     """System status page"""
     try:
         sensor_data = binghome.read_sensors()
-        system_info = {
-            'cpu_temp': 45.0,
-            'memory_used_percent': 35,
-            'disk_used_percent': 42,
-            'uptime': '2 days, 5 hours'
-        }
+        system_info = binghome.get_system_info()
         return render_template('system_status.html', 
                              sensor_data=sensor_data,
                              system_info=system_info)
     except Exception as e:
-        logger.error(f"System template error: {e}")
+        logger.error("System template error: %s", e)
         return f"<h1>System Status</h1><p>Template error: {e}</p><a href='/'>Back</a>"
 
 @app.route('/wifi')
@@ -471,7 +808,7 @@ def devices_page():
     try:
         return render_template('devices.html')
     except Exception as e:
-        logger.error(f"Devices template error: {e}")
+        logger.error("Devices template error: %s", e)
         return f"<h1>Devices</h1><p>Template error: {e}</p><a href='/'>Back</a>"
 
 @app.route('/routines')
@@ -480,7 +817,7 @@ def routines_page():
     try:
         return render_template('routines.html')
     except Exception as e:
-        logger.error(f"Routines template error: {e}")
+        logger.error("Routines template error: %s", e)
         return f"<h1>Routines</h1><p>Template error: {e}</p><a href='/'>Back</a>"
 
 @app.route('/shopping')
@@ -489,7 +826,7 @@ def shopping_page():
     try:
         return render_template('shopping.html')
     except Exception as e:
-        logger.error(f"Shopping template error: {e}")
+        logger.error("Shopping template error: %s", e)
         return f"<h1>Shopping List</h1><p>Template error: {e}</p><a href='/'>Back</a>"
 
 @app.route('/calendar')
@@ -498,7 +835,7 @@ def calendar_page():
     try:
         return render_template('calendar.html')
     except Exception as e:
-        logger.error(f"Calendar template error: {e}")
+        logger.error("Calendar template error: %s", e)
         return f"<h1>Calendar</h1><p>Template error: {e}</p><a href='/'>Back</a>"
 
 @app.route('/intercom')
@@ -507,7 +844,7 @@ def intercom_page():
     try:
         return render_template('intercom.html')
     except Exception as e:
-        logger.error(f"Intercom template error: {e}")
+        logger.error("Intercom template error: %s", e)
         return f"<h1>Intercom</h1><p>Template error: {e}</p><a href='/'>Back</a>"
 
 @app.route("/app/<app_name>")
@@ -531,7 +868,7 @@ def hub_v3_page():
     try:
         return render_template('hub_v3.html')
     except Exception as e:
-        logger.error(f"Hub v3 template error: {e}")
+        logger.error("Hub v3 template error: %s", e)
         return redirect('/')
 
 @app.route('/timers')
@@ -540,7 +877,7 @@ def timers_page():
     try:
         return render_template('timers.html')
     except Exception as e:
-        logger.error(f"Timers template error: {e}")
+        logger.error("Timers template error: %s", e)
         return f"<h1>Timers</h1><p>Template error: {e}</p><a href='/'>Back</a>"
 
 @app.route('/dashboard')
@@ -549,7 +886,7 @@ def dashboard_page():
     try:
         return render_template('dashboard.html', settings=binghome.settings)
     except Exception as e:
-        logger.error(f"Dashboard template error: {e}")
+        logger.error("Dashboard template error: %s", e)
         return redirect('/')
 
 @app.route('/camera-settings')
@@ -558,7 +895,7 @@ def camera_settings_page():
     try:
         return render_template('camera_settings.html')
     except Exception as e:
-        logger.error(f"Camera settings template error: {e}")
+        logger.error("Camera settings template error: %s", e)
         return f"<h1>Camera Settings</h1><p>Template error: {e}</p><a href='/settings'>Back</a>"
 
 @app.route('/security-cameras')
@@ -567,21 +904,49 @@ def security_cameras_page():
     try:
         return render_template('security_cameras.html')
     except Exception as e:
-        logger.error(f"Security cameras template error: {e}")
+        logger.error("Security cameras template error: %s", e)
         return f"<h1>Security Cameras</h1><p>Template error: {e}</p><a href='/settings'>Back</a>"
 
 # ============================================
 # API Routes
 # ============================================
 
+def json_response(obj, status=200):
+    """Serialize straight to a JSON response, skipping the provider dispatch when orjson is available"""
+    if ORJSON_AVAILABLE:
+        return Response(orjson.dumps(obj, option=app.json.option), status=status, mimetype='application/json')
+    return jsonify(obj), status
+
+def _is_ok_response(rv):
+    """Only successful responses are worth caching"""
+    status = rv[1] if isinstance(rv, tuple) else rv.status_code
+    return status == 200
+
+def cached(timeout, unless=None):
+    """Cache a GET route's response for a few seconds when Flask-Caching is available"""
+    if cache is None:
+        return lambda view: view
+    return cache.cached(timeout=timeout, response_filter=_is_ok_response, unless=unless)
+
+def request_timestamp():
+    """ISO timestamp for the current request, computed at most once per request"""
+    if 'now_iso' not in g:
+        g.now_iso = iso_now()
+    return g.now_iso
+
+def _force_requested():
+    """Whether the caller asked for a fresh reading with ?force=1"""
+    return request.args.get('force') == '1'
+
 @app.route('/api/sensor_data')
+@cached(timeout=1, unless=_force_requested)
 def api_sensor_data():
-    """Get current sensor readings"""
+    """Get current sensor readings (?force=1 takes a fresh reading)"""
     try:
-        data = binghome.read_sensors()
-        return jsonify(data)
+        data = binghome.read_sensors(force=_force_requested())
+        return json_response(data)
     except Exception as e:
-        logger.error(f"Sensor API error: {e}")
+        logger.error("Sensor API error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/network_status')
@@ -591,7 +956,7 @@ def api_network_status():
         status = binghome.get_network_status()
         return jsonify(status)
     except Exception as e:
-        logger.error(f"Network API error: {e}")
+        logger.error("Network API error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/weather')
@@ -605,7 +970,7 @@ def api_weather():
             'forecast': forecast
         })
     except Exception as e:
-        logger.error(f"Weather API error: {e}")
+        logger.error("Weather API error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/weather/comprehensive')
@@ -619,7 +984,7 @@ def api_weather_comprehensive():
             # Fallback to basic weather
             return api_weather()
     except Exception as e:
-        logger.error(f"Comprehensive weather API error: {e}")
+        logger.error("Comprehensive weather API error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/weather/test', methods=['POST'])
@@ -654,7 +1019,7 @@ def api_weather_test():
                 }
             })
     except Exception as e:
-        logger.error(f"Weather test API error: {e}")
+        logger.error("Weather test API error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/settings', methods=['GET', 'POST'])
@@ -663,15 +1028,9 @@ def api_settings():
     if request.method == 'GET':
         try:
             # Hide sensitive keys in response
-            safe_settings = binghome.settings.copy()
-            for key in ['openai_api_key', 'weather_api_key', 'bing_api_key', 'home_assistant_token', 
-                       'google_photos_access_token', 'google_photos_refresh_token']:
-                if key in safe_settings and safe_settings[key]:
-                    safe_settings[key + '_configured'] = True
-                    safe_settings[key] = ''
-            return jsonify(safe_settings)
+            return Response(binghome.get_safe_settings_json(), mimetype='application/json')
         except Exception as e:
-            logger.error(f"Settings GET error: {e}")
+            logger.error("Settings GET error: %s", e)
             return jsonify({'error': str(e)}), 500
     
     try:
@@ -688,17 +1047,18 @@ def api_settings():
         else:
             return jsonify({'success': False, 'error': 'Failed to save settings'}), 500
     except Exception as e:
-        logger.error(f"Settings POST error: {e}")
+        logger.error("Settings POST error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/news')
+@cached(timeout=60)
 def api_news():
     """Get news feed"""
     try:
         news = binghome.news.fetch_news()
         return jsonify(news)
     except Exception as e:
-        logger.error(f"News API error: {e}")
+        logger.error("News API error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/timers')
@@ -708,7 +1068,7 @@ def api_timers():
         timers = binghome.timers.get_timers()
         return jsonify(timers)
     except Exception as e:
-        logger.error(f"Timers API error: {e}")
+        logger.error("Timers API error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/timer', methods=['POST'])
@@ -726,7 +1086,7 @@ def api_timer():
             'timer_id': timer_id
         })
     except Exception as e:
-        logger.error(f"Timer creation error: {e}")
+        logger.error("Timer creation error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/media/<action>', methods=['POST'])
@@ -748,7 +1108,7 @@ def api_media(action):
         
         return jsonify({'success': True})
     except Exception as e:
-        logger.error(f"Media control error: {e}")
+        logger.error("Media control error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/google_photos/auth')
@@ -763,11 +1123,10 @@ def google_photos_auth():
         scheme = 'https' if 'ngrok' in host else request.scheme
         redirect_uri = f'{scheme}://{host}/api/google_photos/callback'
         
-        logger.info(f"OAuth initiated - Host: {host}, Scheme: {scheme}, Redirect URI: {redirect_uri}")
+        logger.info("OAuth initiated - Host: %s, Scheme: %s, Redirect URI: %s", host, scheme, redirect_uri)
         
         # Check if accessing via IP address (which Google doesn't allow)
-        import re
-        if re.match(r'^https?://\d+\.\d+\.\d+\.\d+', request.host_url):
+        if IP_HOST_RE.match(request.host_url):
             return """<html><body style='font-family: sans-serif; padding: 20px;'>
             <h2>⚠️ Cannot Use IP Address</h2>
             <p>Google OAuth requires a domain name, not an IP address.</p>
@@ -795,18 +1154,20 @@ def google_photos_auth():
             <button onclick='window.close()'>Close</button>
             </body></html>"""
         
-        auth_url = (
-            'https://accounts.google.com/o/oauth2/v2/auth?'
-            f'client_id={client_id}&'
-            f'redirect_uri={redirect_uri}&'
-            'response_type=code&'
-            'scope=https://www.googleapis.com/auth/photoslibrary.readonly&'
-            'access_type=offline&'
-            'prompt=consent'
-        )
-        return redirect(auth_url)
+        params = {
+            'client_id': client_id,
+            'redirect_uri': redirect_uri,
+            'response_type': 'code',
+            'scope': 'https://www.googleapis.com/auth/photoslibrary.readonly',
+            'access_type': 'offline',
+            'prompt': 'consent',
+            'state': secrets.token_urlsafe(32)
+        }
+        # Remembered so the callback can reject codes it didn't ask for (CSRF)
+        session['google_photos_oauth_state'] = params['state']
+        return redirect(f'https://accounts.google.com/o/oauth2/v2/auth?{urlencode(params)}')
     except Exception as e:
-        logger.error(f"Google Photos auth error: {e}")
+        logger.error("Google Photos auth error: %s", e)
         return f"<html><body><h2>Error</h2><p>{str(e)}</p><button onclick='window.close()'>Close</button></body></html>"
 
 @app.route('/api/google_photos/callback')
@@ -817,6 +1178,12 @@ def google_photos_callback():
         if not code:
             return "<html><body><h2>Authorization Failed</h2><p>No code received</p><button onclick='window.close()'>Close</button></body></html>"
         
+        # Constant-time check that this callback answers our own auth request
+        state = request.args.get('state', '')
+        expected_state = session.pop('google_photos_oauth_state', '')
+        if not (state and expected_state and secrets.compare_digest(state, expected_state)):
+            return "<html><body><h2>Authorization Failed</h2><p>Invalid state - please start the connection again</p><button onclick='window.close()'>Close</button></body></html>"
+        
         client_id = os.environ.get('GOOGLE_CLIENT_ID', '')
         client_secret = os.environ.get('GOOGLE_CLIENT_SECRET', '')
         
@@ -825,17 +1192,16 @@ def google_photos_callback():
         scheme = 'https' if 'ngrok' in host else request.scheme
         redirect_uri = f'{scheme}://{host}/api/google_photos/callback'
         
-        logger.info(f"OAuth callback - Host: {host}, Scheme: {scheme}, Redirect URI: {redirect_uri}")
+        logger.info("OAuth callback - Host: %s, Scheme: %s, Redirect URI: %s", host, scheme, redirect_uri)
         
         # Exchange code for tokens
-        import requests
-        token_response = requests.post('https://oauth2.googleapis.com/token', data={
+        token_response = http_session.post('https://oauth2.googleapis.com/token', data={
             'code': code,
             'client_id': client_id,
             'client_secret': client_secret,
             'redirect_uri': redirect_uri,
             'grant_type': 'authorization_code'
-        })
+        }, timeout=(3, 10))
         
         if token_response.status_code == 200:
             tokens = token_response.json()
@@ -843,6 +1209,8 @@ def google_photos_callback():
             settings['google_photos_connected'] = True
             settings['google_photos_access_token'] = tokens.get('access_token', '')
             settings['google_photos_refresh_token'] = tokens.get('refresh_token', '')
+            if token_expiry:
+                settings['google_photos_token_expires_at'] = token_expiry(tokens)
             binghome.save_settings(settings)
             
             return """<html><body>
@@ -853,7 +1221,7 @@ def google_photos_callback():
         else:
             return f"<html><body><h2>Token Exchange Failed</h2><p>{token_response.text}</p><button onclick='window.close()'>Close</button></body></html>"
     except Exception as e:
-        logger.error(f"Google Photos callback error: {e}")
+        logger.error("Google Photos callback error: %s", e)
         return f"<html><body><h2>Error</h2><p>{str(e)}</p><button onclick='window.close()'>Close</button></body></html>"
 
 @app.route('/api/google_photos/status')
@@ -873,21 +1241,20 @@ def google_photos_albums():
         if binghome.google_photos:
             result = binghome.google_photos.get_albums()
             if result['success']:
-                logger.info(f"Found {len(result.get('albums', []))} albums")
+                logger.info("Found %s albums", len(result.get('albums', [])))
                 return jsonify(result)
             else:
                 status_code = result.get('status_code', 500)
                 return jsonify(result), status_code
         else:
             # Fallback to direct API call
-            import requests
             access_token = binghome.settings.get('google_photos_access_token', '')
             
             if not access_token:
                 return jsonify({'success': False, 'error': 'Not connected'}), 401
             
             headers = {'Authorization': f'Bearer {access_token}'}
-            response = requests.get('https://photoslibrary.googleapis.com/v1/albums', headers=headers)
+            response = http_session.get('https://photoslibrary.googleapis.com/v1/albums', headers=headers, timeout=(3, 10))
             
             if response.status_code == 200:
                 data = response.json()
@@ -896,7 +1263,7 @@ def google_photos_albums():
             else:
                 return jsonify({'success': False, 'error': f'API error: {response.status_code}'}), response.status_code
     except Exception as e:
-        logger.error(f"Google Photos albums error: {e}", exc_info=True)
+        logger.error("Google Photos albums error: %s", e, exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/google_photos/photos')
@@ -919,7 +1286,6 @@ def google_photos_photos():
                 return jsonify(result), status_code
         else:
             # Fallback to direct API call
-            import requests
             access_token = binghome.settings.get('google_photos_access_token', '')
             
             if not access_token:
@@ -929,10 +1295,11 @@ def google_photos_photos():
                 return jsonify({'success': False, 'error': 'No album selected'}), 400
             
             headers = {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'}
-            response = requests.post(
+            response = http_session.post(
                 'https://photoslibrary.googleapis.com/v1/mediaItems:search',
                 headers=headers,
-                json={'albumId': album_id, 'pageSize': 100}
+                json={'albumId': album_id, 'pageSize': 100},
+                timeout=(3, 10)
             )
             
             if response.status_code == 200:
@@ -948,7 +1315,7 @@ def google_photos_photos():
             else:
                 return jsonify({'success': False, 'error': 'Failed to fetch photos'}), response.status_code
     except Exception as e:
-        logger.error(f"Google Photos photos error: {e}")
+        logger.error("Google Photos photos error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/google_photos/disconnect', methods=['POST'])
@@ -959,18 +1326,20 @@ def google_photos_disconnect():
         settings['google_photos_connected'] = False
         settings['google_photos_access_token'] = ''
         settings['google_photos_refresh_token'] = ''
+        settings['google_photos_token_expires_at'] = ''
         settings['google_photos_album'] = ''
         binghome.save_settings(settings)
         return jsonify({'success': True})
     except Exception as e:
-        logger.error(f"Google Photos disconnect error: {e}")
+        logger.error("Google Photos disconnect error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/google_photos/shared')
 def google_photos_shared():
     """Get photos from a shared Google Photos album link"""
     try:
-        from core.google_photos import fetch_shared_album_photos
+        if not fetch_shared_album_photos:
+            return jsonify({'success': False, 'error': 'Google Photos module not available', 'photos': []})
 
         # Get shared URL from settings or query param
         shared_url = request.args.get('url') or binghome.settings.get('google_photos_shared_url', '')
@@ -980,17 +1349,16 @@ def google_photos_shared():
 
         result = fetch_shared_album_photos(shared_url)
         return jsonify(result)
-    except ImportError:
-        return jsonify({'success': False, 'error': 'Google Photos module not available', 'photos': []})
     except Exception as e:
-        logger.error(f"Shared album error: {e}")
+        logger.error("Shared album error: %s", e)
         return jsonify({'success': False, 'error': str(e), 'photos': []}), 500
 
 @app.route('/api/google_photos/shared/test', methods=['POST'])
 def google_photos_shared_test():
     """Test a shared album URL"""
     try:
-        from core.google_photos import fetch_shared_album_photos
+        if not fetch_shared_album_photos:
+            return jsonify({'success': False, 'error': 'Google Photos module not available'})
 
         data = request.get_json() or {}
         shared_url = data.get('url', '')
@@ -1009,7 +1377,7 @@ def google_photos_shared_test():
         else:
             return jsonify(result)
     except Exception as e:
-        logger.error(f"Shared album test error: {e}")
+        logger.error("Shared album test error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/devices')
@@ -1019,7 +1387,7 @@ def api_devices():
         devices_data = binghome.devices.get_all_devices()
         return jsonify(devices_data)
     except Exception as e:
-        logger.error(f"Devices API error: {e}")
+        logger.error("Devices API error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/devices/scan', methods=['POST'])
@@ -1029,7 +1397,7 @@ def api_devices_scan():
         devices_data = binghome.devices.scan_all_devices()
         return jsonify(devices_data)
     except Exception as e:
-        logger.error(f"Device scan error: {e}")
+        logger.error("Device scan error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/devices/control', methods=['POST'])
@@ -1050,7 +1418,7 @@ def api_devices_control():
         result = binghome.devices.control_device(device_type, device_id, action, **kwargs)
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Device control error: {e}")
+        logger.error("Device control error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/shopping', methods=['GET', 'POST'])
@@ -1062,9 +1430,7 @@ def api_shopping():
     if request.method == 'GET':
         try:
             if shopping_file.exists():
-                with open(shopping_file) as f:
-                    data = json.load(f)
-                return jsonify(data)
+                return jsonify(app.json.loads(shopping_file.read_bytes()))
             return jsonify({'items': []})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -1072,8 +1438,7 @@ def api_shopping():
     elif request.method == 'POST':
         try:
             data = request.get_json() or {}
-            with open(shopping_file, 'w') as f:
-                json.dump(data, f)
+            shopping_file.write_text(app.json.dumps(data))
             return jsonify({'success': True})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
@@ -1087,9 +1452,7 @@ def api_routines():
     if request.method == 'GET':
         try:
             if routines_file.exists():
-                with open(routines_file) as f:
-                    data = json.load(f)
-                return jsonify(data)
+                return jsonify(app.json.loads(routines_file.read_bytes()))
             return jsonify({'routines': []})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -1100,16 +1463,14 @@ def api_routines():
             # Load existing routines
             routines = []
             if routines_file.exists():
-                with open(routines_file) as f:
-                    routines = json.load(f).get('routines', [])
+                routines = app.json.loads(routines_file.read_bytes()).get('routines', [])
 
             # Add new routine
             data['id'] = f"routine_{int(time.time())}"
-            data['created'] = datetime.now().isoformat()
+            data['created'] = request_timestamp()
             routines.append(data)
 
-            with open(routines_file, 'w') as f:
-                json.dump({'routines': routines}, f)
+            routines_file.write_text(app.json.dumps({'routines': routines}))
             return jsonify({'success': True, 'id': data['id']})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
@@ -1144,19 +1505,11 @@ def api_intercom_announce():
 
         if not message:
             return jsonify({'success': False, 'error': 'No message provided'})
+        if not isinstance(message, str):
+            return jsonify({'success': False, 'error': 'Message must be a string'})
 
-        # Use TTS to speak the message
-        try:
-            import pyttsx3
-            engine = pyttsx3.init()
-            engine.setProperty('rate', binghome.settings.get('tts_rate', 150))
-            engine.setProperty('volume', binghome.settings.get('tts_volume', 0.9))
-            engine.say(message)
-            engine.runAndWait()
-        except Exception as e:
-            logger.error(f"TTS error: {e}")
-            # Fallback to espeak
-            subprocess.run(['espeak', message], capture_output=True)
+        # Speak the message in the background
+        binghome.announce(message)
 
         return jsonify({'success': True})
     except Exception as e:
@@ -1170,7 +1523,7 @@ def api_intercom_broadcast():
             return jsonify({'success': False, 'error': 'No audio file'})
 
         audio = request.files['audio']
-        devices = json.loads(request.form.get('devices', '["all"]'))
+        devices = app.json.loads(request.form.get('devices', '["all"]'))
 
         # Save audio temporarily
         audio_path = BASE_DIR / 'data' / 'broadcast.wav'
@@ -1181,7 +1534,7 @@ def api_intercom_broadcast():
         try:
             subprocess.run(['aplay', str(audio_path)], capture_output=True)
         except Exception as e:
-            logger.error(f"Audio playback error: {e}")
+            logger.error("Audio playback error: %s", e)
 
         return jsonify({'success': True})
     except Exception as e:
@@ -1194,20 +1547,21 @@ def api_calendar_events():
     return jsonify({'events': []})
 
 @app.route('/api/health')
+@cached(timeout=5)
 def api_health():
     """System health check"""
     try:
-        return jsonify({
+        return json_response({
             'status': 'healthy' if binghome.running else 'stopped',
             'hardware': RPI_AVAILABLE,
             'weather_source': binghome.settings.get('weather_source', 'openweather'),
             'apps_configured': len(binghome.settings.get('apps', {})),
             'startup_complete': binghome.startup_complete,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': request_timestamp(),
             'version': '3.0.0'
         })
     except Exception as e:
-        logger.error(f"Health check error: {e}")
+        logger.error("Health check error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/restart', methods=['POST'])
@@ -1217,7 +1571,7 @@ def api_restart():
         subprocess.Popen(['sudo', 'systemctl', 'restart', 'binghome'])
         return jsonify({'success': True, 'message': 'Restarting BingHome...'})
     except Exception as e:
-        logger.error(f"Restart error: {e}")
+        logger.error("Restart error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # ============================================
@@ -1231,7 +1585,7 @@ def api_bluetooth_paired():
         devices = bluetooth_utils.get_paired_devices()
         return jsonify({'success': True, 'devices': devices})
     except Exception as e:
-        logger.error(f"Bluetooth paired error: {e}")
+        logger.error("Bluetooth paired error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/bluetooth/scan', methods=['POST'])
@@ -1241,7 +1595,7 @@ def api_bluetooth_scan():
         devices = bluetooth_utils.scan_for_devices()
         return jsonify({'success': True, 'devices': devices})
     except Exception as e:
-        logger.error(f"Bluetooth scan error: {e}")
+        logger.error("Bluetooth scan error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/bluetooth/pair', methods=['POST'])
@@ -1256,7 +1610,7 @@ def api_bluetooth_pair():
         success, message = bluetooth_utils.pair_device(mac)
         return jsonify({'success': success, 'message': message if success else None, 'error': message if not success else None})
     except Exception as e:
-        logger.error(f"Bluetooth pair error: {e}")
+        logger.error("Bluetooth pair error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/bluetooth/connect', methods=['POST'])
@@ -1271,7 +1625,7 @@ def api_bluetooth_connect():
         success, message = bluetooth_utils.connect_device(mac)
         return jsonify({'success': success, 'message': message if success else None, 'error': message if not success else None})
     except Exception as e:
-        logger.error(f"Bluetooth connect error: {e}")
+        logger.error("Bluetooth connect error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/bluetooth/disconnect', methods=['POST'])
@@ -1286,7 +1640,7 @@ def api_bluetooth_disconnect():
         success, message = bluetooth_utils.disconnect_device(mac)
         return jsonify({'success': success, 'message': message if success else None, 'error': message if not success else None})
     except Exception as e:
-        logger.error(f"Bluetooth disconnect error: {e}")
+        logger.error("Bluetooth disconnect error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/bluetooth/remove', methods=['POST'])
@@ -1301,7 +1655,7 @@ def api_bluetooth_remove():
         success, message = bluetooth_utils.remove_device(mac)
         return jsonify({'success': success, 'message': message if success else None, 'error': message if not success else None})
     except Exception as e:
-        logger.error(f"Bluetooth remove error: {e}")
+        logger.error("Bluetooth remove error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # ============================================
@@ -1317,7 +1671,7 @@ def api_cameras_detect():
             return jsonify({'cameras': cameras})
         return jsonify({'cameras': [], 'error': 'Camera service not available'})
     except Exception as e:
-        logger.error(f"Camera detect error: {e}")
+        logger.error("Camera detect error: %s", e)
         return jsonify({'cameras': [], 'error': str(e)}), 500
 
 @app.route('/api/cameras/snapshot')
@@ -1329,7 +1683,6 @@ def api_cameras_snapshot():
             snapshot_path, error = camera_service.get_camera_snapshot(camera_id)
             if snapshot_path:
                 # Copy to static folder for web access
-                import shutil
                 static_path = BASE_DIR / 'static' / 'snapshots'
                 static_path.mkdir(parents=True, exist_ok=True)
                 dest_path = static_path / 'camera_snapshot.jpg'
@@ -1338,7 +1691,7 @@ def api_cameras_snapshot():
             return jsonify({'success': False, 'error': error or 'Failed to capture'})
         return jsonify({'success': False, 'error': 'Camera service not available'})
     except Exception as e:
-        logger.error(f"Camera snapshot error: {e}")
+        logger.error("Camera snapshot error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/cameras/stream/start', methods=['POST'])
@@ -1351,7 +1704,7 @@ def api_cameras_stream_start():
             return jsonify({'success': success, 'message': message})
         return jsonify({'success': False, 'error': 'Camera service not available'})
     except Exception as e:
-        logger.error(f"Camera stream start error: {e}")
+        logger.error("Camera stream start error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/cameras/stream/stop', methods=['POST'])
@@ -1363,7 +1716,7 @@ def api_cameras_stream_stop():
             return jsonify({'success': success, 'message': message})
         return jsonify({'success': False, 'error': 'Camera service not available'})
     except Exception as e:
-        logger.error(f"Camera stream stop error: {e}")
+        logger.error("Camera stream stop error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/security-cameras', methods=['GET', 'POST'])
@@ -1376,7 +1729,7 @@ def api_security_cameras():
                 return jsonify({'cameras': cameras})
             return jsonify({'cameras': []})
         except Exception as e:
-            logger.error(f"Security cameras GET error: {e}")
+            logger.error("Security cameras GET error: %s", e)
             return jsonify({'cameras': [], 'error': str(e)}), 500
 
     elif request.method == 'POST':
@@ -1394,7 +1747,7 @@ def api_security_cameras():
                 return jsonify({'success': True, 'camera': camera})
             return jsonify({'success': False, 'error': 'Security camera service not available'})
         except Exception as e:
-            logger.error(f"Security cameras POST error: {e}")
+            logger.error("Security cameras POST error: %s", e)
             return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/security-cameras/<camera_id>', methods=['GET', 'DELETE', 'PUT'])
@@ -1409,7 +1762,7 @@ def api_security_camera(camera_id):
                 return jsonify({'success': False, 'error': 'Camera not found'}), 404
             return jsonify({'success': False, 'error': 'Service not available'})
         except Exception as e:
-            logger.error(f"Security camera GET error: {e}")
+            logger.error("Security camera GET error: %s", e)
             return jsonify({'success': False, 'error': str(e)}), 500
 
     elif request.method == 'DELETE':
@@ -1419,7 +1772,7 @@ def api_security_camera(camera_id):
                 return jsonify({'success': True})
             return jsonify({'success': False, 'error': 'Service not available'})
         except Exception as e:
-            logger.error(f"Security camera DELETE error: {e}")
+            logger.error("Security camera DELETE error: %s", e)
             return jsonify({'success': False, 'error': str(e)}), 500
 
     elif request.method == 'PUT':
@@ -1432,7 +1785,7 @@ def api_security_camera(camera_id):
                 return jsonify({'success': False, 'error': 'Camera not found'}), 404
             return jsonify({'success': False, 'error': 'Service not available'})
         except Exception as e:
-            logger.error(f"Security camera PUT error: {e}")
+            logger.error("Security camera PUT error: %s", e)
             return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/security-cameras/<camera_id>/snapshot')
@@ -1454,7 +1807,7 @@ def api_security_camera_snapshot(camera_id):
             return jsonify({'success': False, 'error': 'Camera not found'}), 404
         return jsonify({'success': False, 'error': 'Service not available'})
     except Exception as e:
-        logger.error(f"Security camera snapshot error: {e}")
+        logger.error("Security camera snapshot error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/security-cameras/test', methods=['POST'])
@@ -1472,7 +1825,7 @@ def api_security_cameras_test():
             return jsonify({'success': success, 'message': message if success else None, 'error': message if not success else None})
         return jsonify({'success': False, 'error': 'Service not available'})
     except Exception as e:
-        logger.error(f"Security camera test error: {e}")
+        logger.error("Security camera test error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/security-cameras/discover')
@@ -1484,7 +1837,7 @@ def api_security_cameras_discover():
             return jsonify({'cameras': cameras})
         return jsonify({'cameras': [], 'error': 'Service not available'})
     except Exception as e:
-        logger.error(f"Security camera discover error: {e}")
+        logger.error("Security camera discover error: %s", e)
         return jsonify({'cameras': [], 'error': str(e)}), 500
 
 # ============================================
@@ -1494,18 +1847,23 @@ def api_security_cameras_discover():
 if SOCKETIO_AVAILABLE and socketio:
     @socketio.on('connect')
     def handle_connect():
-        logger.info(f"Client connected: {request.sid}")
+        logger.info("Client connected: %s", request.sid)
+        connected_clients.add(request.sid)
+        join_room(SENSOR_ROOM)
         try:
             emit('status', {
                 'status': 'connected',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': iso_now()
             })
+            # Hand over the latest snapshot now rather than waiting for the next broadcast
+            emit('sensor_update', binghome.read_sensors())
         except Exception as e:
-            logger.error(f"Socket connect error: {e}")
+            logger.error("Socket connect error: %s", e)
 
     @socketio.on('disconnect')
     def handle_disconnect():
-        logger.info(f"Client disconnected: {request.sid}")
+        logger.info("Client disconnected: %s", request.sid)
+        connected_clients.discard(request.sid)
 
     @socketio.on('voice_command')
     def handle_voice_command(data):
@@ -1518,19 +1876,19 @@ if SOCKETIO_AVAILABLE and socketio:
                 emit('voice_response', {
                     'command': command,
                     'response': response,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': iso_now()
                 })
         except Exception as e:
-            logger.error(f"Voice command error: {e}")
+            logger.error("Voice command error: %s", e)
             emit('error', {'message': str(e)})
 
     @socketio.on('request_sensor_data')
     def handle_sensor_request():
         try:
-            data = binghome.read_sensors()
-            emit('sensor_update', data)
+            # Always answer - pages ask after rebuilding their sensor widgets
+            emit('sensor_update', binghome.read_sensors())
         except Exception as e:
-            logger.error(f"Sensor request error: {e}")
+            logger.error("Sensor request error: %s", e)
 
 # ============================================
 # Error Handlers
@@ -1538,35 +1896,67 @@ if SOCKETIO_AVAILABLE and socketio:
 
 @app.errorhandler(404)
 def not_found(e):
+    template = PAGE_TEMPLATE['not_found']
+    if template is None:
+        return NOT_FOUND_HTML, 404
     try:
-        return render_template('404.html'), 404
-    except:
-        return "<h1>404 - Page Not Found</h1><a href='/'>Home</a>", 404
+        return render_template(template), 404
+    except Exception as e:
+        logger.error("404 template error: %s", e)
+        return NOT_FOUND_HTML, 404
 
 @app.errorhandler(500)
 def server_error(e):
+    template = PAGE_TEMPLATE['server_error']
+    if template is None:
+        return SERVER_ERROR_HTML, 500
     try:
-        return render_template('500.html'), 500
-    except:
-        return "<h1>500 - Server Error</h1><a href='/'>Home</a>", 500
+        return render_template(template), 500
+    except Exception:
+        # Whatever broke the request may break the error page too
+        return SERVER_ERROR_HTML, 500
 
 # ============================================
 # Background Tasks
 # ============================================
 
+def sensor_data_changed(old, new):
+    """Check whether a sensor reading differs meaningfully from the last one sent"""
+    if old is None:
+        return True
+    for key, threshold in (('temperature', 0.2), ('humidity', 1.0)):
+        if old.get(key) is None or new.get(key) is None:
+            if old.get(key) != new.get(key):
+                return True
+        elif abs(new[key] - old[key]) > threshold:
+            return True
+    return any(old.get(key) != new.get(key) for key in ('gas_detected', 'light_level', 'air_quality'))
+
 def background_tasks():
     """Background monitoring and updates"""
+    # Yield to the Socket.IO async loop between polls rather than blocking a thread
+    sleep = socketio.sleep if socketio else time.sleep
+    last_emitted = None
+    polls_since_emit = 0
     while binghome.running:
         try:
-            # Update sensor data and emit to connected clients
+            # Poll the hardware (the only regular poller)
+            sensor_data = binghome.poll_sensors()
+            
+            # Only emit to connected clients when the reading changed, plus a periodic heartbeat
             if SOCKETIO_AVAILABLE and socketio:
-                sensor_data = binghome.read_sensors()
-                socketio.emit('sensor_update', sensor_data)
+                polls_since_emit += 1
+                if not connected_clients:
+                    last_emitted = None
+                elif polls_since_emit >= SENSOR_HEARTBEAT_POLLS or sensor_data_changed(last_emitted, sensor_data):
+                    socketio.emit('sensor_update', sensor_data, to=SENSOR_ROOM)
+                    last_emitted = sensor_data
+                    polls_since_emit = 0
             
-            time.sleep(5)  # Update every 5 seconds
+            sleep(SENSOR_POLL_INTERVAL)
         except Exception as e:
-            logger.error(f"Background task error: {e}")
-            time.sleep(10)
+            logger.error("Background task error: %s", e)
+            sleep(10)
 
 # ============================================
 # Startup Function
@@ -1579,15 +1969,17 @@ def startup_tasks():
     try:
         # Start background monitoring
         if not binghome.startup_complete:
-            bg_thread = threading.Thread(target=background_tasks, daemon=True)
-            bg_thread.start()
+            if socketio:
+                socketio.start_background_task(background_tasks)
+            else:
+                threading.Thread(target=background_tasks, daemon=True).start()
             logger.info("Background tasks started")
         
         binghome.startup_complete = True
         logger.info("BingHome Hub startup complete")
         
     except Exception as e:
-        logger.error(f"Startup error: {e}")
+        logger.error("Startup error: %s", e)
 
 # ============================================
 # Main Entry Point
@@ -1603,13 +1995,15 @@ if __name__ == '__main__':
         port = int(os.environ.get('PORT', 5000))
         debug = os.environ.get('DEBUG', 'False').lower() == 'true'
         
-        logger.info(f"Starting BingHome Hub on {host}:{port}")
-        logger.info(f"Weather source: {binghome.settings.get('weather_source', 'openweather')}")
-        logger.info(f"Apps configured: {len(binghome.settings.get('apps', {}))}")
+        logger.info("Starting BingHome Hub on %s:%s", host, port)
+        logger.info("Weather source: %s", binghome.settings.get('weather_source', 'openweather'))
+        logger.info("Apps configured: %s", len(binghome.settings.get('apps', {})))
         
         # Start the server
         if SOCKETIO_AVAILABLE and socketio:
-            socketio.run(app, host=host, port=port, debug=debug, allow_unsafe_werkzeug=True)
+            # The Werkzeug opt-in only applies to threading mode; gevent runs its own WSGI server
+            run_options = {'allow_unsafe_werkzeug': True} if ASYNC_MODE == 'threading' else {}
+            socketio.run(app, host=host, port=port, debug=debug, **run_options)
         else:
             app.run(host=host, port=port, debug=debug)
             
@@ -1624,5 +2018,5 @@ if __name__ == '__main__':
                 pass
                 
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         sys.exit(1)
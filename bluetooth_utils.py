@@ -4,10 +4,17 @@ Uses bluetoothctl for device management
 """
 import subprocess
 import re
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# bluetoothctl output patterns
+# Device lines are matched across the whole output in one pass
+_DEVICE_RE = re.compile(r'Device[ \t]+([0-9A-Fa-f:]{17})[ \t]+(.+)')
+_ICON_RE = re.compile(r'Icon:\s+(.+)')
+_RSSI_RE = re.compile(r'RSSI:\s+(-?\d+)')
+
 def run_bluetoothctl(*args, timeout=10):
     """Run a bluetoothctl command and return output"""
     try:
@@ -15,10 +22,10 @@ def run_bluetoothctl(*args, timeout=10):
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
         return result.stdout + result.stderr
     except subprocess.TimeoutExpired:
-        logger.warning(f"bluetoothctl timeout: {args}")
+        logger.warning("bluetoothctl timeout: %s", args)
         return ""
-    except Exception as e:
-        logger.error(f"bluetoothctl error: {e}")
+    except OSError as e:
+        logger.error("bluetoothctl error: %s", e)
         return ""
 
 def get_paired_devices():
@@ -30,30 +37,28 @@ def get_paired_devices():
             output = run_bluetoothctl('paired-devices')
         
         # Parse: Device XX:XX:XX:XX:XX:XX DeviceName
-        for line in output.split('\n'):
-            match = re.search(r'Device\s+([0-9A-Fa-f:]{17})\s+(.+)', line)
-            if match:
-                mac = match.group(1)
-                name = match.group(2).strip()
-                
-                # Check if connected
-                info_output = run_bluetoothctl('info', mac)
-                connected = 'Connected: yes' in info_output
-                
-                # Try to get device type/icon
-                device_type = None
-                icon_match = re.search(r'Icon:\s+(.+)', info_output)
-                if icon_match:
-                    device_type = icon_match.group(1).strip()
-                
-                devices.append({
-                    'mac': mac,
-                    'name': name,
-                    'connected': connected,
-                    'type': device_type
-                })
+        for match in _DEVICE_RE.finditer(output):
+            mac = match.group(1)
+            name = match.group(2).strip()
+            
+            # Check if connected
+            info_output = run_bluetoothctl('info', mac)
+            connected = 'Connected: yes' in info_output
+            
+            # Try to get device type/icon
+            device_type = None
+            icon_match = _ICON_RE.search(info_output)
+            if icon_match:
+                device_type = icon_match.group(1).strip()
+            
+            devices.append({
+                'mac': mac,
+                'name': name,
+                'connected': connected,
+                'type': device_type
+            })
     except Exception as e:
-        logger.error(f"Error getting paired devices: {e}")
+        logger.error("Error getting paired devices: %s", e)
     
     return devices
 
@@ -71,7 +76,6 @@ def scan_for_devices(duration=8):
                       capture_output=True, timeout=2)
         
         # Wait for scan
-        import time
         time.sleep(duration)
         
         # Stop scan
@@ -84,37 +88,35 @@ def scan_for_devices(duration=8):
         # Get already paired devices to exclude
         paired = {d['mac'] for d in get_paired_devices()}
         
-        for line in output.split('\n'):
-            match = re.search(r'Device\s+([0-9A-Fa-f:]{17})\s+(.+)', line)
-            if match:
-                mac = match.group(1)
-                name = match.group(2).strip()
-                
-                # Skip already paired devices
-                if mac in paired:
-                    continue
-                
-                # Get device info for type
-                info_output = run_bluetoothctl('info', mac)
-                device_type = None
-                rssi = None
-                
-                icon_match = re.search(r'Icon:\s+(.+)', info_output)
-                if icon_match:
-                    device_type = icon_match.group(1).strip()
-                
-                rssi_match = re.search(r'RSSI:\s+(-?\d+)', info_output)
-                if rssi_match:
-                    rssi = int(rssi_match.group(1))
-                
-                devices.append({
-                    'mac': mac,
-                    'name': name,
-                    'type': device_type,
-                    'rssi': rssi
-                })
+        for match in _DEVICE_RE.finditer(output):
+            mac = match.group(1)
+            name = match.group(2).strip()
+            
+            # Skip already paired devices
+            if mac in paired:
+                continue
+            
+            # Get device info for type
+            info_output = run_bluetoothctl('info', mac)
+            device_type = None
+            rssi = None
+            
+            icon_match = _ICON_RE.search(info_output)
+            if icon_match:
+                device_type = icon_match.group(1).strip()
+            
+            rssi_match = _RSSI_RE.search(info_output)
+            if rssi_match:
+                rssi = int(rssi_match.group(1))
+            
+            devices.append({
+                'mac': mac,
+                'name': name,
+                'type': device_type,
+                'rssi': rssi
+            })
     except Exception as e:
-        logger.error(f"Scan error: {e}")
+        logger.error("Scan error: %s", e)
     
     return devices
 
@@ -134,7 +136,7 @@ def pair_device(mac):
         
         return True, "Paired successfully"
     except Exception as e:
-        logger.error(f"Pair error: {e}")
+        logger.error("Pair error: %s", e)
         return False, str(e)
 
 def connect_device(mac):
@@ -147,7 +149,7 @@ def connect_device(mac):
         
         return True, "Connected successfully"
     except Exception as e:
-        logger.error(f"Connect error: {e}")
+        logger.error("Connect error: %s", e)
         return False, str(e)
 
 def disconnect_device(mac):
@@ -156,7 +158,7 @@ def disconnect_device(mac):
         output = run_bluetoothctl('disconnect', mac)
         return True, "Disconnected"
     except Exception as e:
-        logger.error(f"Disconnect error: {e}")
+        logger.error("Disconnect error: %s", e)
         return False, str(e)
 
 def remove_device(mac):
@@ -169,5 +171,5 @@ def remove_device(mac):
         
         return True, "Device removed"
     except Exception as e:
-        logger.error(f"Remove error: {e}")
+        logger.error("Remove error: %s", e)
         return False, str(e)
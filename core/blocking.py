@@ -0,0 +1,18 @@
+# ============================================
+# core/blocking.py - Blocking Call Helper
+# ============================================
+"""Keeps calls that block inside C code from stalling the gevent hub"""
+
+try:
+    import gevent
+    from gevent import monkey
+    GEVENT_AVAILABLE = True
+except ImportError:
+    GEVENT_AVAILABLE = False
+
+
+def run_blocking(func, *args):
+    """Run a call that blocks in C code, on a native thread under gevent so it can't stall the hub"""
+    if GEVENT_AVAILABLE and monkey.is_module_patched('threading'):
+        return gevent.get_hub().threadpool.apply(func, args)
+    return func(*args)
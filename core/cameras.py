@@ -5,6 +5,7 @@ Handles Raspberry Pi camera, USB cameras, and security camera RTSP streams
 
 import os
 import subprocess
+import requests
 import json
 import logging
 import threading
@@ -127,7 +128,7 @@ class CameraService:
                 except (subprocess.TimeoutExpired, FileNotFoundError):
                     pass
         except Exception as e:
-            logger.error(f"Error detecting USB cameras: {e}")
+            logger.error("Error detecting USB cameras: %s", e)
 
         return cameras
 
@@ -176,7 +177,7 @@ class CameraService:
             else:
                 return None, "Failed to capture snapshot"
         except Exception as e:
-            logger.error(f"Snapshot error: {e}")
+            logger.error("Snapshot error: %s", e)
             return None, str(e)
 
     def start_mjpeg_stream(self, camera_id=None, port=8081):
@@ -218,7 +219,7 @@ class CameraService:
             self.streaming = True
             return True, f"Stream started on port {port}"
         except Exception as e:
-            logger.error(f"Stream start error: {e}")
+            logger.error("Stream start error: %s", e)
             return False, str(e)
 
     def stop_stream(self):
@@ -286,7 +287,7 @@ class SecurityCameraService:
                 with open(self.settings_path, 'r') as f:
                     return json.load(f).get('cameras', [])
         except Exception as e:
-            logger.error(f"Error loading cameras: {e}")
+            logger.error("Error loading cameras: %s", e)
         return []
 
     def save_cameras(self):
@@ -297,7 +298,7 @@ class SecurityCameraService:
                 json.dump({'cameras': self.cameras}, f, indent=2)
             return True
         except Exception as e:
-            logger.error(f"Error saving cameras: {e}")
+            logger.error("Error saving cameras: %s", e)
             return False
 
     def add_camera(self, name, rtsp_url, vendor='generic', thumbnail=None):
@@ -376,7 +377,7 @@ class SecurityCameraService:
             if os.path.exists(output_path):
                 return output_path
         except Exception as e:
-            logger.error(f"Thumbnail capture error: {e}")
+            logger.error("Thumbnail capture error: %s", e)
         return None
 
     def discover_cameras(self, ip_range=None):
@@ -415,7 +416,7 @@ class SecurityCameraService:
                             'vendor': 'unknown'
                         })
         except Exception as e:
-            logger.error(f"Camera discovery error: {e}")
+            logger.error("Camera discovery error: %s", e)
 
         return discovered
 
@@ -438,7 +439,6 @@ class SecurityCameraService:
         """Try to identify camera vendor"""
         try:
             # Try HTTP to identify web interface
-            import requests
             for port in [80, 8080]:
                 try:
                     response = requests.get(f'http://{ip}:{port}', timeout=3)
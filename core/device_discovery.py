@@ -11,6 +11,9 @@ import time
 import json
 from datetime import datetime
 
+from core.http_session import http_session
+from core.blocking import run_blocking
+
 logger = logging.getLogger(__name__)
 
 # Try importing Bluetooth library
@@ -115,7 +118,7 @@ class DeviceDiscovery:
                                 'last_seen': datetime.now().isoformat()
                             })
                 except Exception as e:
-                    logger.error(f"Nmap scan error: {e}")
+                    logger.error("Nmap scan error: %s", e)
 
             # Method 3: Parse arp table (fallback)
             if not devices:
@@ -152,10 +155,10 @@ class DeviceDiscovery:
             devices = self._identify_smart_devices(devices)
 
             self.discovered_devices['wifi'] = devices
-            logger.info(f"Found {len(devices)} WiFi/network devices")
+            logger.info("Found %s WiFi/network devices", len(devices))
 
         except Exception as e:
-            logger.error(f"WiFi scan error: {e}")
+            logger.error("WiFi scan error: %s", e)
 
     def _scan_bluetooth_devices(self):
         """Scan for Bluetooth devices"""
@@ -167,12 +170,13 @@ class DeviceDiscovery:
 
         try:
             logger.info("Starting Bluetooth scan...")
-            nearby_devices = bluetooth.discover_devices(
+            # Inquiry blocks inside BlueZ for the full duration
+            nearby_devices = run_blocking(lambda: bluetooth.discover_devices(
                 duration=8,
                 lookup_names=True,
                 flush_cache=True,
                 lookup_class=True
-            )
+            ))
 
             for addr, name, device_class in nearby_devices:
                 devices.append({
@@ -186,10 +190,10 @@ class DeviceDiscovery:
                 })
 
             self.discovered_devices['bluetooth'] = devices
-            logger.info(f"Found {len(devices)} Bluetooth devices")
+            logger.info("Found %s Bluetooth devices", len(devices))
 
         except Exception as e:
-            logger.error(f"Bluetooth scan error: {e}")
+            logger.error("Bluetooth scan error: %s", e)
 
     def _scan_home_assistant_devices(self):
         """Scan for Home Assistant devices"""
@@ -203,18 +207,16 @@ class DeviceDiscovery:
             return
 
         try:
-            import requests
-
             headers = {
                 'Authorization': f'Bearer {ha_token}',
                 'Content-Type': 'application/json'
             }
 
             # Get all entities from Home Assistant
-            response = requests.get(
+            response = http_session.get(
                 f'{ha_url}/api/states',
                 headers=headers,
-                timeout=5
+                timeout=(3, 5)
             )
 
             if response.status_code == 200:
@@ -239,12 +241,12 @@ class DeviceDiscovery:
                         })
 
                 self.discovered_devices['home_assistant'] = devices
-                logger.info(f"Found {len(devices)} Home Assistant devices")
+                logger.info("Found %s Home Assistant devices", len(devices))
             else:
-                logger.error(f"Home Assistant API error: {response.status_code}")
+                logger.error("Home Assistant API error: %s", response.status_code)
 
         except Exception as e:
-            logger.error(f"Home Assistant scan error: {e}")
+            logger.error("Home Assistant scan error: %s", e)
 
     def _identify_smart_devices(self, devices):
         """Try to identify smart home devices from network devices"""
@@ -290,7 +292,7 @@ class DeviceDiscovery:
                 for line in lines:
                     if 'name =' in line:
                         return line.split('name =')[1].strip().rstrip('.')
-        except:
+        except (OSError, subprocess.SubprocessError):
             pass
 
         return ip
@@ -319,7 +321,7 @@ class DeviceDiscovery:
         if device_type == 'home_assistant':
             return self._control_home_assistant_device(device_id, action, **kwargs)
         else:
-            logger.warning(f"Direct control not supported for {device_type}")
+            logger.warning("Direct control not supported for %s", device_type)
             return {'success': False, 'error': 'Control not supported'}
 
     def _control_home_assistant_device(self, entity_id, action, **kwargs):
@@ -331,8 +333,6 @@ class DeviceDiscovery:
             return {'success': False, 'error': 'Home Assistant not configured'}
 
         try:
-            import requests
-
             headers = {
                 'Authorization': f'Bearer {ha_token}',
                 'Content-Type': 'application/json'
@@ -347,11 +347,11 @@ class DeviceDiscovery:
             }
             service_data.update(kwargs)
 
-            response = requests.post(
+            response = http_session.post(
                 f'{ha_url}/api/services/{domain}/{action}',
                 headers=headers,
                 json=service_data,
-                timeout=5
+                timeout=(3, 5)
             )
 
             if response.status_code == 200:
@@ -360,7 +360,7 @@ class DeviceDiscovery:
                 return {'success': False, 'error': f'HTTP {response.status_code}'}
 
         except Exception as e:
-            logger.error(f"Device control error: {e}")
+            logger.error("Device control error: %s", e)
             return {'success': False, 'error': str(e)}
 
     def get_all_devices(self):
@@ -6,12 +6,25 @@ Manages Google Photos OAuth and API access with automatic token refresh.
 """
 
 import os
+import re
 import logging
 import requests
+
+from core.http_session import http_session
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Photo URLs embedded in shared album pages
+_PHOTO_URL_RE = re.compile(r'https://lh3\.googleusercontent\.com/[a-zA-Z0-9_\-/=]+(?=["\'>\s])')
+_PHOTO_DATA_RE = re.compile(r'\["(https://lh3\.googleusercontent\.com/[^"]+)"')
+
+
+def token_expiry(tokens):
+    """ISO time to refresh a token response's access token, one minute before it expires"""
+    expires_in = int(tokens.get('expires_in', 3600))  # Google tokens typically last an hour
+    return (datetime.now() + timedelta(seconds=expires_in - 60)).isoformat()
+
 
 class GooglePhotosService:
     """Handles Google Photos OAuth and API access"""
@@ -31,6 +44,7 @@ class GooglePhotosService:
         self.get_settings = settings_getter
         self.save_settings = settings_saver
         self._token_expiry = None
+        self._token_expiry_raw = None
 
     def _get_credentials(self):
         """Get OAuth credentials from environment"""
@@ -49,6 +63,19 @@ class GooglePhotosService:
         settings = self.get_settings()
         return settings.get('google_photos_refresh_token', '')
 
+    def _get_token_expiry(self):
+        """Get when the stored access token should be refreshed, parsed once per token"""
+        raw = self.get_settings().get('google_photos_token_expires_at', '')
+        if raw != self._token_expiry_raw:
+            self._token_expiry_raw = raw
+            try:
+                self._token_expiry = datetime.fromisoformat(raw) if raw else None
+            except (TypeError, ValueError):
+                # Unknown expiry - a 401 from the API will still trigger a refresh
+                logger.warning("Ignoring malformed google_photos_token_expires_at: %r", raw)
+                self._token_expiry = None
+        return self._token_expiry
+
     def is_connected(self):
         """Check if Google Photos is connected"""
         settings = self.get_settings()
@@ -71,12 +98,12 @@ class GooglePhotosService:
             return False
 
         try:
-            response = requests.post(self.TOKEN_URL, data={
+            response = http_session.post(self.TOKEN_URL, data={
                 'client_id': credentials['client_id'],
                 'client_secret': credentials['client_secret'],
                 'refresh_token': refresh_token,
                 'grant_type': 'refresh_token'
-            }, timeout=30)
+            }, timeout=(3, 30))
 
             if response.status_code == 200:
                 tokens = response.json()
@@ -85,6 +112,7 @@ class GooglePhotosService:
                 if new_access_token:
                     settings = self.get_settings().copy()
                     settings['google_photos_access_token'] = new_access_token
+                    settings['google_photos_token_expires_at'] = token_expiry(tokens)
                     
                     # Update refresh token if a new one was provided
                     if tokens.get('refresh_token'):
@@ -92,10 +120,6 @@ class GooglePhotosService:
                     
                     self.save_settings(settings)
                     
-                    # Set token expiry (tokens typically expire in 1 hour)
-                    expires_in = tokens.get('expires_in', 3600)
-                    self._token_expiry = datetime.now() + timedelta(seconds=expires_in - 60)  # Refresh 1 min early
-                    
                     logger.info("Google Photos access token refreshed successfully")
                     return True
                 else:
@@ -104,7 +128,7 @@ class GooglePhotosService:
             else:
                 error_data = response.json() if response.text else {}
                 error_msg = error_data.get('error_description', response.text[:200])
-                logger.error(f"Token refresh failed: {response.status_code} - {error_msg}")
+                logger.error("Token refresh failed: %s - %s", response.status_code, error_msg)
                 
                 # If refresh token is invalid, disconnect
                 if response.status_code == 400 and 'invalid_grant' in str(error_data):
@@ -116,7 +140,7 @@ class GooglePhotosService:
             logger.error("Token refresh timed out")
             return False
         except Exception as e:
-            logger.error(f"Token refresh error: {e}")
+            logger.error("Token refresh error: %s", e)
             return False
 
     def _disconnect(self):
@@ -125,6 +149,7 @@ class GooglePhotosService:
         settings['google_photos_connected'] = False
         settings['google_photos_access_token'] = ''
         settings['google_photos_refresh_token'] = ''
+        settings['google_photos_token_expires_at'] = ''
         settings['google_photos_album'] = ''
         self.save_settings(settings)
         logger.info("Google Photos disconnected due to invalid credentials")
@@ -139,8 +164,9 @@ class GooglePhotosService:
         if not access_token:
             return {'success': False, 'error': 'Not connected', 'status_code': 401}
 
-        # Check if token needs refresh
-        if self._token_expiry and datetime.now() >= self._token_expiry:
+        # Refresh ahead of expiry rather than waiting for a 401
+        expiry = self._get_token_expiry()
+        if expiry and datetime.now() >= expiry:
             if not self.refresh_access_token():
                 return {'success': False, 'error': 'Token refresh failed', 'status_code': 401}
             access_token = self._get_access_token()
@@ -154,7 +180,7 @@ class GooglePhotosService:
         url = f"{self.BASE_URL}/{endpoint}"
         
         try:
-            response = requests.request(method, url, headers=headers, timeout=30, **kwargs)
+            response = http_session.request(method, url, headers=headers, timeout=(3, 30), **kwargs)
             
             # If unauthorized, try refreshing token once
             if response.status_code == 401:
@@ -162,7 +188,7 @@ class GooglePhotosService:
                 if self.refresh_access_token():
                     access_token = self._get_access_token()
                     headers['Authorization'] = f'Bearer {access_token}'
-                    response = requests.request(method, url, headers=headers, timeout=30, **kwargs)
+                    response = http_session.request(method, url, headers=headers, timeout=(3, 30), **kwargs)
                 else:
                     return {'success': False, 'error': 'Authentication failed', 'status_code': 401}
 
@@ -175,7 +201,7 @@ class GooglePhotosService:
         except requests.Timeout:
             return {'success': False, 'error': 'Request timed out', 'status_code': 504}
         except Exception as e:
-            logger.error(f"Google Photos API error: {e}")
+            logger.error("Google Photos API error: %s", e)
             return {'success': False, 'error': str(e), 'status_code': 500}
 
     def get_albums(self, page_size=50):
@@ -254,14 +280,12 @@ def fetch_shared_album_photos(shared_url):
     This parses the shared album page to extract photo URLs.
     No authentication required - just needs the public share link.
     """
-    import re
-
     if not shared_url:
         return {'success': False, 'error': 'No shared album URL provided', 'photos': []}
 
     try:
         # Follow redirects to get the actual album page
-        response = requests.get(shared_url, timeout=15, allow_redirects=True)
+        response = http_session.get(shared_url, timeout=(3, 15), allow_redirects=True)
 
         if response.status_code != 200:
             return {'success': False, 'error': f'Failed to access album: {response.status_code}', 'photos': []}
@@ -273,10 +297,7 @@ def fetch_shared_album_photos(shared_url):
         # Look for photo URLs in the HTML - they follow patterns like:
         # https://lh3.googleusercontent.com/...
 
-        # Pattern for Google Photos image URLs
-        url_pattern = r'https://lh3\.googleusercontent\.com/[a-zA-Z0-9_\-/=]+(?=["\'>\s])'
-
-        found_urls = set(re.findall(url_pattern, html))
+        found_urls = set(_PHOTO_URL_RE.findall(html))
 
         # Filter to get actual photo URLs (not thumbnails/icons)
         for url in found_urls:
@@ -297,12 +318,11 @@ def fetch_shared_album_photos(shared_url):
                 })
 
         if photos:
-            logger.info(f"Found {len(photos)} photos in shared album")
+            logger.info("Found %s photos in shared album", len(photos))
             return {'success': True, 'photos': photos, 'count': len(photos)}
         else:
             # Try alternative pattern - sometimes photos are in data arrays
-            data_pattern = r'\["(https://lh3\.googleusercontent\.com/[^"]+)"'
-            data_urls = set(re.findall(data_pattern, html))
+            data_urls = set(_PHOTO_DATA_RE.findall(html))
 
             for url in data_urls:
                 if len(url) > 80:
@@ -318,7 +338,7 @@ def fetch_shared_album_photos(shared_url):
                     })
 
             if photos:
-                logger.info(f"Found {len(photos)} photos in shared album (alt method)")
+                logger.info("Found %s photos in shared album (alt method)", len(photos))
                 return {'success': True, 'photos': photos, 'count': len(photos)}
 
             return {'success': False, 'error': 'No photos found in album', 'photos': []}
@@ -326,5 +346,5 @@ def fetch_shared_album_photos(shared_url):
     except requests.Timeout:
         return {'success': False, 'error': 'Connection timed out', 'photos': []}
     except Exception as e:
-        logger.error(f"Error fetching shared album: {e}")
+        logger.error("Error fetching shared album: %s", e)
         return {'success': False, 'error': str(e), 'photos': []}
@@ -0,0 +1,18 @@
+# ============================================
+# core/http_session.py - Shared HTTP Session
+# ============================================
+"""Shared requests session so outbound HTTP calls reuse pooled keep-alive connections"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+http_session = requests.Session()
+
+# Retry a failed connect once; read timeouts and error statuses are not retried, so a
+# dead network costs one extra short connect timeout rather than repeating the whole call
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                       max_retries=Retry(total=1, connect=1, read=0, status=0, other=0,
+                                         backoff_factor=0.3))
+http_session.mount('http://', _adapter)
+http_session.mount('https://', _adapter)
@@ -21,7 +21,7 @@ class MediaController:
         try:
             self.is_playing = True
             self.current_source = source or "default"
-            logger.info(f"Playing from {self.current_source}")
+            logger.info("Playing from %s", self.current_source)
             
             # Example: Use omxplayer on Raspberry Pi
             if os.path.exists('/usr/bin/omxplayer'):
@@ -29,7 +29,7 @@ class MediaController:
             
             return True
         except Exception as e:
-            logger.error(f"Media play error: {e}")
+            logger.error("Media play error: %s", e)
             return False
     
     def pause(self):
@@ -73,5 +73,5 @@ class MediaController:
         except:
             pass
         
-        logger.info(f"Volume set to {self.volume}")
+        logger.info("Volume set to %s", self.volume)
         return True
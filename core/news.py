@@ -4,17 +4,29 @@
 """News fetching module for BingHome"""
 
 import os
+import time
 import logging
-import requests
+from core.http_session import http_session
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Try importing fast JSON parser
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 class NewsManager:
+    CACHE_SECONDS = 300  # Bing refreshes headlines on the order of minutes
+
     def __init__(self):
         self.api_key = os.environ.get('BING_API_KEY', '')
         self.news_cache = []
         self.last_fetch = None
+        self._cache_key = None
+        self._fetched_at = 0.0
         
     def fetch_news(self, category='general', count=10):
         """Fetch news from Bing News API"""
@@ -22,6 +34,11 @@ class NewsManager:
             logger.warning("Bing API key not configured")
             return self.news_cache
         
+        # Serve the parsed articles until they go stale
+        cache_key = (category, count)
+        if cache_key == self._cache_key and time.monotonic() - self._fetched_at < self.CACHE_SECONDS:
+            return self.news_cache
+        
         try:
             headers = {'Ocp-Apim-Subscription-Key': self.api_key}
             params = {
@@ -31,15 +48,15 @@ class NewsManager:
                 'category': category
             }
             
-            response = requests.get(
+            response = http_session.get(
                 'https://api.bing.microsoft.com/v7.0/news',
                 headers=headers,
                 params=params,
-                timeout=10
+                timeout=(3, 10)
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
                 self.news_cache = [{
                     'title': article['name'],
                     'description': article.get('description', ''),
@@ -51,10 +68,12 @@ class NewsManager:
                 } for article in data.get('value', [])]
                 
                 self.last_fetch = datetime.now()
-                logger.info(f"Fetched {len(self.news_cache)} news articles")
+                self._cache_key = cache_key
+                self._fetched_at = time.monotonic()
+                logger.info("Fetched %s news articles", len(self.news_cache))
                 
         except Exception as e:
-            logger.error(f"News fetch error: {e}")
+            logger.error("News fetch error: %s", e)
         
         return self.news_cache
     
@@ -73,18 +92,18 @@ class NewsManager:
                 'count': 10
             }
             
-            response = requests.get(
+            response = http_session.get(
                 'https://api.bing.microsoft.com/v7.0/news/search',
                 headers=headers,
                 params=params,
-                timeout=10
+                timeout=(3, 10)
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
                 return data.get('value', [])
                 
         except Exception as e:
-            logger.error(f"News search error: {e}")
+            logger.error("News search error: %s", e)
         
         return []
@@ -10,6 +10,8 @@ import time
 from pathlib import Path
 from datetime import datetime
 
+from core.http_session import http_session
+
 logger = logging.getLogger(__name__)
 
 class PhotoManager:
@@ -44,10 +46,10 @@ class PhotoManager:
             self.cached_photos = photos
             self.last_scan = datetime.now().isoformat()
 
-            logger.info(f"Found {len(photos)} local photos")
+            logger.info("Found %s local photos", len(photos))
 
         except Exception as e:
-            logger.error(f"Error scanning photos: {e}")
+            logger.error("Error scanning photos: %s", e)
 
         return photos
 
@@ -77,10 +79,8 @@ class PhotoManager:
 
     def add_photo_from_url(self, url, name=None):
         """Download and add a photo from URL"""
-        import requests
-
         try:
-            response = requests.get(url, timeout=10)
+            response = http_session.get(url, timeout=(3, 10))
             response.raise_for_status()
 
             # Generate filename
@@ -98,7 +98,7 @@ class PhotoManager:
             return {'success': True, 'path': str(file_path)}
 
         except Exception as e:
-            logger.error(f"Error adding photo: {e}")
+            logger.error("Error adding photo: %s", e)
             return {'success': False, 'error': str(e)}
 
     def delete_photo(self, filename):
@@ -4,10 +4,12 @@
 """Timer and routine management for BingHome"""
 
 import os
+import heapq
+import math
 import logging
 import threading
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -17,50 +19,88 @@ class TimerManager:
         self.timers = {}
         self.routines = []
         
+        # Pending expiries as (ends_ts, timer_id), all served by one scheduler thread.
+        # ends_ts is on the monotonic clock, so NTP stepping the wall clock after boot can't skew timers
+        self._heap = []
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run_scheduler, daemon=True).start()
+        
     def create_timer(self, duration, name="Timer", callback=None):
         """Create a new timer"""
+        if (isinstance(duration, bool) or not isinstance(duration, (int, float))
+                or not math.isfinite(duration) or duration < 0):
+            raise ValueError(f"Invalid timer duration: {duration!r}")
         timer_id = str(uuid.uuid4())[:8]
         
-        def timer_thread():
-            time.sleep(duration)
-            if timer_id in self.timers:
-                logger.info(f"Timer '{name}' completed")
-                if callback:
-                    callback()
-                del self.timers[timer_id]
-        
         timer = {
             'id': timer_id,
             'name': name,
             'duration': duration,
-            'started': datetime.now(),
-            'ends': datetime.now() + timedelta(seconds=duration),
-            'thread': threading.Thread(target=timer_thread, daemon=True)
+            'ends_ts': time.monotonic() + duration,
+            'callback': callback
         }
         
-        self.timers[timer_id] = timer
-        timer['thread'].start()
+        with self._cond:
+            self.timers[timer_id] = timer
+            heapq.heappush(self._heap, (timer['ends_ts'], timer_id))
+            self._cond.notify()
         
-        logger.info(f"Timer '{name}' created for {duration} seconds")
+        logger.info("Timer '%s' created for %s seconds", name, duration)
         return timer_id
     
     def cancel_timer(self, timer_id):
         """Cancel a timer"""
-        if timer_id in self.timers:
-            # Thread will check if timer still exists
-            del self.timers[timer_id]
-            logger.info(f"Timer {timer_id} cancelled")
+        with self._cond:
+            # The heap entry is left behind and skipped when it comes due
+            timer = self.timers.pop(timer_id, None)
+        if timer:
+            logger.info("Timer %s cancelled", timer_id)
             return True
         return False
     
+    def _run_scheduler(self):
+        """Sleep until the earliest timer is due, then fire it"""
+        while True:
+            # This thread serves every timer, so it must survive any single failure
+            try:
+                self._fire_next()
+            except Exception as e:
+                logger.error("Timer scheduler error: %s", e)
+    
+    def _fire_next(self):
+        """Wait for the earliest pending timer and fire it, or return early if woken"""
+        with self._cond:
+            while not self._heap:
+                self._cond.wait()
+            ends_ts, timer_id = self._heap[0]
+            delay = ends_ts - time.monotonic()
+            if delay > 0:
+                # Woken early if a sooner timer is added
+                self._cond.wait(min(delay, threading.TIMEOUT_MAX))
+                return
+            heapq.heappop(self._heap)
+            timer = self.timers.pop(timer_id, None)
+        
+        if timer:
+            logger.info("Timer '%s' completed", timer['name'])
+            if timer['callback']:
+                try:
+                    timer['callback']()
+                except Exception as e:
+                    logger.error("Timer callback error: %s", e)
+    
     def get_timers(self):
         """Get all active timers"""
+        now = time.monotonic()
+        with self._cond:
+            timers = list(self.timers.values())
+        
         active_timers = []
-        for timer_id, timer in self.timers.items():
-            remaining = (timer['ends'] - datetime.now()).total_seconds()
+        for timer in timers:
+            remaining = timer['ends_ts'] - now
             if remaining > 0:
                 active_timers.append({
-                    'id': timer_id,
+                    'id': timer['id'],
                     'name': timer['name'],
                     'remaining': int(remaining),
                     'duration': timer['duration']
@@ -79,7 +119,7 @@ class TimerManager:
         }
         
         self.routines.append(routine)
-        logger.info(f"Routine '{name}' created")
+        logger.info("Routine '%s' created", name)
         return routine['id']
     
     def check_routines(self):
@@ -97,7 +137,7 @@ class TimerManager:
     
     def execute_routine(self, routine):
         """Execute a routine's actions"""
-        logger.info(f"Executing routine: {routine['name']}")
+        logger.info("Executing routine: %s", routine['name'])
         for action in routine['actions']:
             # Actions would be executed here
-            logger.info(f"  Action: {action}")
+            logger.info("  Action: %s", action)
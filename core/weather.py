@@ -5,11 +5,41 @@
 
 import os
 import logging
-import requests
-from datetime import datetime, timedelta
+from core.http_session import http_session
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4)
+def _default_forecast_for(day_ordinal, days):
+    """Placeholder forecast starting on the given day (shared between callers - don't mutate)"""
+    conditions = ['Sunny', 'Partly Cloudy', 'Cloudy', 'Light Rain', 'Clear', 'Scattered Clouds']
+    descriptions = ['Sunny', 'Partly Cloudy', 'Cloudy', 'Light Rain', 'Clear Sky', 'Scattered Clouds']
+    start = date.fromordinal(day_ordinal)
+    
+    forecast = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        condition_idx = i % len(conditions)
+        
+        forecast.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'day_name': day.strftime('%A'),
+            'day_short': day.strftime('%a'),
+            'temp_min': 18 + (i % 5),
+            'temp_max': 26 + (i % 6),
+            'temp_avg': 22 + (i % 4),
+            'condition': conditions[condition_idx],
+            'description': descriptions[condition_idx],
+            'humidity_avg': 65 + (i % 20),
+            'wind_speed_avg': 10.5 + (i % 8),
+            'precipitation_chance': (i * 15) % 80,
+            'icon': '01d'
+        })
+    
+    return forecast
+
 class WeatherService:
     def __init__(self, settings=None):
         self.settings = settings or {}
@@ -93,7 +123,7 @@ class WeatherService:
                 'units': 'metric'
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = http_session.get(url, params=params, timeout=(3, 10))
             
             if response.status_code == 200:
                 data = response.json()
@@ -117,10 +147,10 @@ class WeatherService:
                     'source': 'OpenWeatherMap',
                     'radar_available': False
                 }
-                logger.info(f"OpenWeather data updated for {location}")
+                logger.info("OpenWeather data updated for %s", location)
                 
         except Exception as e:
-            logger.error(f"OpenWeather API error: {e}")
+            logger.error("OpenWeather API error: %s", e)
             return self._get_default_weather(location)
         
         return self.current_weather
@@ -205,7 +235,7 @@ class WeatherService:
                 'units': 'metric'
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = http_session.get(url, params=params, timeout=(3, 10))
             
             if response.status_code == 200:
                 data = response.json()
@@ -256,40 +286,18 @@ class WeatherService:
                         'icon': '01d'  # Would need to determine from conditions
                     })
                 
-                logger.info(f"Forecast updated for {location}")
+                logger.info("Forecast updated for %s", location)
                 
         except Exception as e:
-            logger.error(f"Forecast API error: {e}")
+            logger.error("Forecast API error: %s", e)
             return self._get_default_forecast(days)
         
         return self.forecast
     
     def _get_default_forecast(self, days):
         """Generate default forecast data"""
-        conditions = ['Sunny', 'Partly Cloudy', 'Cloudy', 'Light Rain', 'Clear', 'Scattered Clouds']
-        descriptions = ['Sunny', 'Partly Cloudy', 'Cloudy', 'Light Rain', 'Clear Sky', 'Scattered Clouds']
-        
-        forecast = []
-        for i in range(days):
-            date = datetime.now() + timedelta(days=i)
-            condition_idx = i % len(conditions)
-            
-            forecast.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'day_name': date.strftime('%A'),
-                'day_short': date.strftime('%a'),
-                'temp_min': 18 + (i % 5),
-                'temp_max': 26 + (i % 6),
-                'temp_avg': 22 + (i % 4),
-                'condition': conditions[condition_idx],
-                'description': descriptions[condition_idx],
-                'humidity_avg': 65 + (i % 20),
-                'wind_speed_avg': 10.5 + (i % 8),
-                'precipitation_chance': (i * 15) % 80,
-                'icon': '01d'
-            })
-        
-        return forecast
+        # The placeholder only changes when the date does, so build it once per day
+        return list(_default_forecast_for(date.today().toordinal(), days))
     
     def get_radar_info(self):
         """Get radar information for current source"""